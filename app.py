@@ -1,10 +1,22 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+import numpy as np
+import openpyxl
 import pandas as pd
 from pathlib import Path
+from werkzeug.http import http_date
 from werkzeug.utils import secure_filename
-import io
 import os
+from collections import Counter
+from functools import lru_cache
+from itertools import count, islice
+from types import SimpleNamespace
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 app = Flask(__name__)
@@ -12,8 +24,228 @@ app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 CORS(app)
 
-# Fake database (for hackathon)
-violations = []
+# safety_stats key -> dataset column it is summed from (when the column exists)
+SAFETY_COLUMNS = {
+    "accidents_2017": "Number of Accidents - 2017",
+    "killed_2017": "Persons Killed - 2017",
+    "injured_2017": "Persons Injured - 2017",
+    "accidents_2018": "Number of Accidents - 2018",
+    "killed_2018": "Persons Killed - 2018",
+    "injured_2018": "Persons Injured - 2018",
+}
+
+# accepted column names for each normalized field, in priority order
+FIELD_VARIANTS = {
+    'vehicle': ['vehicle', 'Vehicle', 'Vehicle No', 'vehicle_no', 'plate', 'Plate', 'RegistrationNo', 'Registration No'],
+    'type': ['type', 'Type', 'Violation Type', 'violation', 'Violation', 'ViolationType'],
+    'location': ['location', 'Location', 'location_name', 'Location Name', 'place', 'Place'],
+    'date': ['date', 'Date', 'date_of_violation', 'Date of Violation', 'violation_date', 'Violation Date'],
+    'latitude': ['latitude', 'Latitude', 'lat', 'Lat'],
+    'longitude': ['longitude', 'Longitude', 'lon', 'Lon', 'long', 'Long'],
+}
+
+# derived columns kept on violations_df but not returned by /violations
+INTERNAL_COLUMNS = ['ts', 'hour']
+# trailing UTC offset after a time of day, e.g. "10:00:00+05:30" or "10:00Z"
+UTC_OFFSET_RE = r'(\d:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|GMT|[+-]\d{2}(?::?\d{2})?)$'
+# text fields stored as pandas categoricals
+CATEGORY_COLUMNS = ['vehicle', 'type', 'location', 'date']
+
+# seconds browsers may reuse index.html / dataset.html before revalidating
+STATIC_PAGE_MAX_AGE = 300
+
+# options for the default CSV parser: date fields stay raw text (normalize_frame
+# parses them) and floats are rounded exactly, matching the pyarrow parser
+CSV_READ_OPTIONS = {
+    'dtype': {c: str for c in FIELD_VARIANTS['date']},
+    'float_precision': 'round_trip',
+}
+
+# CSVs bigger than this are streamed in chunks of CSV_CHUNK_ROWS rows
+CSV_CHUNK_THRESHOLD = 20 * 1024 * 1024
+CSV_CHUNK_ROWS = 100_000
+
+
+def empty_violations_df():
+    """Return an empty violations frame with the normalized columns."""
+    df = pd.DataFrame(columns=list(FIELD_VARIANTS))
+    df['ts'] = pd.Series(dtype='datetime64[ns]')
+    df['hour'] = pd.Series(dtype='Int8')
+    return df
+
+
+def set_violations(df):
+    """Replace the in-memory violations and the caches derived from them.
+
+    Everything is built first and then published with a single assignment to
+    `store`, so a request running alongside an upload (the server is threaded)
+    sees either the old snapshot or the new one, never a mix of the two.
+    """
+    global store
+    # dictionary-encode the text columns (categories in first-seen order) and
+    # map each category to its display label, blank -> 'Unknown'
+    category_labels = {}
+    for field in CATEGORY_COLUMNS:
+        codes, uniques = pd.factorize(df[field])
+        df[field] = pd.Categorical.from_codes(codes, uniques)
+        categories = df[field].cat.categories
+        category_labels[field] = pd.factorize(categories.where(categories != '', 'Unknown'))
+    # row positions in timestamp order (NaT last), so a date range is a slice
+    ts = df['ts'].to_numpy()
+    ts_order = np.argsort(ts, kind='stable')
+    groups, labels = category_labels['location']
+    coords = pd.DataFrame({
+        'location': labels[groups[df['location'].cat.codes.to_numpy()]],
+        'latitude': pd.to_numeric(df['latitude'], errors='coerce').to_numpy(),
+        'longitude': pd.to_numeric(df['longitude'], errors='coerce').to_numpy(),
+    })
+    store = SimpleNamespace(
+        violations_df=df,
+        category_labels=category_labels,
+        ts_order=ts_order,
+        sorted_ts=pd.DatetimeIndex(ts[ts_order][:int(df['ts'].notna().sum())]),
+        blank_date_rows=np.flatnonzero((df['date'] == '').to_numpy()),
+        coords_df=coords.dropna(subset=['latitude', 'longitude']).groupby('location').first(),
+        version=next(data_versions),
+    )
+
+
+def category_counts(snapshot, col):
+    """Count a categorical violations_df column (or slice of it) per display label."""
+    groups, labels = snapshot.category_labels[col.name]
+    counts = np.bincount(col.cat.codes.to_numpy(), minlength=len(groups))
+    return labels, np.bincount(groups, weights=counts, minlength=len(labels)).astype(np.int64)
+
+
+# Fake database (for hackathon), replaced as a whole by set_violations:
+#   violations_df   one row per violation, normalized columns first, then any
+#                   extra dataset columns, then the INTERNAL_COLUMNS
+#   category_labels CATEGORY_COLUMNS field -> (label index of each category, distinct labels)
+#   ts_order, sorted_ts, blank_date_rows
+#                   row positions sorted by ts, the parsed timestamps in that
+#                   order, and rows with a blank date
+#   coords_df       first known coordinates for each location, indexed by location
+#   version         unique per snapshot; keys the /analytics cache
+store = None
+data_versions = count(1)
+set_violations(empty_violations_df())
+
+def read_csv_fast(src):
+    """Read a CSV with the multithreaded pyarrow parser, falling back to the default one.
+
+    The result matches a plain read with CSV_READ_OPTIONS: pyarrow infers date
+    and time columns and would rewrite their text, so those columns (and the
+    date fields) are read again as strings with the default parser.
+    """
+    try:
+        df = pd.read_csv(src, engine='pyarrow')
+    except (ImportError, ValueError):
+        # pyarrow missing, or it rejected the file; the C parser is more lenient
+        if hasattr(src, 'seek'):
+            src.seek(0)
+        return pd.read_csv(src, **CSV_READ_OPTIONS)
+    text_cols = [
+        c for c in df.columns
+        if c in CSV_READ_OPTIONS['dtype']
+        or pd.api.types.is_datetime64_any_dtype(df[c])
+        or (df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True) in ('date', 'time', 'datetime'))
+    ]
+    if text_cols:
+        if hasattr(src, 'seek'):
+            src.seek(0)
+        raw = pd.read_csv(src, usecols=text_cols, dtype=str)
+        for c in text_cols:
+            df[c] = raw[c]
+    return df
+
+
+def read_excel_fast(src, **kwargs):
+    """Read an Excel file with calamine if installed, otherwise openpyxl."""
+    try:
+        return pd.read_excel(src, engine='calamine', **kwargs)
+    except ImportError:
+        if hasattr(src, 'seek'):
+            src.seek(0)
+        return pd.read_excel(src, engine='openpyxl', **kwargs)
+
+def normalize_frame(df):
+    """Map a raw dataset frame onto the normalized violation columns."""
+    # normalize column names
+    df.columns = [str(c).strip() for c in df.columns]
+
+    # collapse each group of known column-name variants into one canonical
+    # column, taking the first non-empty value in priority order
+    for field, variants in FIELD_VARIANTS.items():
+        present = [c for c in variants if c in df.columns]
+        if present:
+            # fill column by column; bfill(axis=1) would transpose the frame
+            col = df[present[0]]
+            for c in present[1:]:
+                col = col.fillna(df[c])
+        else:
+            col = pd.Series(float('nan'), index=df.index)
+        df = df.drop(columns=present)
+        df[field] = col
+    for field in ['vehicle', 'type', 'location', 'date']:
+        col = df[field].astype(object)
+        df[field] = col.where(col.notna(), '').astype(str).str.strip()
+    # normalized fields first, then the extra dataset columns that hold any
+    # data (blank spreadsheet columns would otherwise be kept as all-null)
+    extra = df.drop(columns=list(FIELD_VARIANTS)).dropna(axis=1, how='all')
+    df = df[list(FIELD_VARIANTS) + list(extra.columns)]
+    # datetime cells in extra columns (e.g. Excel dates) are sent in the same
+    # HTTP-date form jsonify gave them, e.g. 'Wed, 01 Feb 2023 10:00:00 GMT'
+    for c in extra.columns:
+        col = df[c]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            if col.dt.tz is not None:
+                col = col.dt.tz_convert(None)
+            df[c] = col.dt.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        elif col.dtype == object:
+            df[c] = col.map(lambda v: http_date(v) if isinstance(v, (date, datetime)) else v)
+    # parse the date once here so /analytics doesn't re-parse it per request;
+    # offsets are converted to UTC and dropped so `ts` is always naive
+    ts = pd.to_datetime(df['date'], errors='coerce', format='mixed', utc=True)
+    df['ts'] = ts.dt.tz_convert(None).dt.as_unit('ns')
+    # by_hour counts the wall-clock hour as written, so take it from a copy
+    # of the date with any trailing UTC offset stripped
+    local = df['date'].str.replace(UTC_OFFSET_RE, r'\1', regex=True)
+    if not local.equals(df['date']):
+        ts = pd.to_datetime(local, errors='coerce', format='mixed')
+    df['hour'] = ts.dt.hour.astype('Int8')
+    return df
+
+def preview_workbook(src, nrows=10):
+    """Return columns, the first `nrows` rows and the row count of every sheet in an XLSX file.
+
+    Uses openpyxl's read-only mode, which streams each sheet's XML instead of
+    loading every cell (and its styles) into memory.
+    """
+    wb = openpyxl.load_workbook(src, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for ws in wb.worksheets:
+            rows = list(islice(ws.iter_rows(values_only=True), nrows + 1))
+            header, body = (rows[0], rows[1:]) if rows else ((), [])
+            total = ws.max_row
+            if total is None:
+                # no stored dimensions; count the rows instead
+                total = sum(1 for _ in ws.iter_rows(values_only=True))
+            sheets[ws.title] = {
+                'columns': [str(c) if c is not None else f'Unnamed: {i}' for i, c in enumerate(header)],
+                'rows': [['' if v is None else v for v in r] for r in body],
+                'total_rows': max(total - 1, 0),
+            }
+        return sheets
+    finally:
+        wb.close()
+
+def fast_json(obj):
+    """Like jsonify(), but encodes with orjson when it is installed."""
+    if orjson is None:
+        return jsonify(obj)
+    body = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    return Response(body, mimetype='application/json')
 
 # Try to load dataset from Downloads (change path if you moved the file)
 def load_dataset(path, clear_existing=False):
@@ -22,79 +254,53 @@ def load_dataset(path, clear_existing=False):
         print(f"Dataset not found: {path}")
         return False
     try:
-        # optionally clear existing in-memory violations
-        if clear_existing:
-            violations.clear()
-        # choose reader based on extension
+        # choose reader based on extension; large CSVs are parsed in chunks so
+        # only one raw chunk is held at a time (the normalized chunks are all
+        # kept until they are concatenated into the store)
         if p.suffix.lower() == '.csv':
-            df = pd.read_csv(p)
+            if p.stat().st_size > CSV_CHUNK_THRESHOLD:
+                frames = pd.read_csv(p, chunksize=CSV_CHUNK_ROWS, **CSV_READ_OPTIONS)
+            else:
+                frames = [read_csv_fast(p)]
         else:
             # Excel (default)
-            df = pd.read_excel(p, engine='openpyxl')
-        # normalize column names
-        df.columns = [str(c).strip() for c in df.columns]
-
-        def pick_field(row, variants):
-            for k in variants:
-                if k in row and pd.notna(row[k]):
-                    return row[k]
-            return None
-
-        records = []
-        for r in df.to_dict(orient="records"):
-            vehicle = pick_field(r, ['vehicle','Vehicle','Vehicle No','vehicle_no','plate','Plate','RegistrationNo','Registration No'])
-            vtype = pick_field(r, ['type','Type','Violation Type','violation','Violation','ViolationType'])
-            location = pick_field(r, ['location','Location','location_name','Location Name','place','Place'])
-            date = pick_field(r, ['date','Date','date_of_violation','Date of Violation','violation_date','Violation Date'])
-            lat = pick_field(r, ['latitude', 'Latitude', 'lat', 'Lat'])
-            lon = pick_field(r, ['longitude', 'Longitude', 'lon', 'Lon', 'long', 'Long'])
-
-            # build normalized record keeping other fields too
-            normalized = {
-                'vehicle': str(vehicle).strip() if vehicle is not None else '',
-                'type': str(vtype).strip() if vtype is not None else '',
-                'location': str(location).strip() if location is not None else '',
-                'date': str(date).strip() if date is not None else '',
-                'latitude': lat,
-                'longitude': lon
-            }
-            # include other fields
-            for k, val in r.items():
-                if pd.isna(val):
-                    continue
-                if k in ['vehicle','Vehicle','Vehicle No','vehicle_no','plate','Plate','RegistrationNo','Registration No',
-                         'type','Type','Violation Type','violation','Violation','ViolationType',
-                         'location','Location','location_name','Location Name','place','Place',
-                         'latitude', 'Latitude', 'lat', 'Lat',
-                         'longitude', 'Longitude', 'lon', 'Lon', 'long', 'Long']:
-                    continue
-                normalized[k] = val
-            records.append(normalized)
-
-        violations.extend(records)
-        print(f"Loaded {len(records)} records from {path}")
+            frames = [read_excel_fast(p)]
+        loaded = [normalize_frame(df) for df in frames]
+        loaded_rows = sum(len(df) for df in loaded)
+
+        # publish only once parsing succeeded: readers keep the old snapshot
+        # meanwhile, and a failed replace leaves it in place
+        base = empty_violations_df() if clear_existing else store.violations_df
+        parts = [df for df in [base] + loaded if not df.empty]
+        set_violations(pd.concat(parts, ignore_index=True) if parts else empty_violations_df())
+        print(f"Loaded {loaded_rows} records from {path}")
         return True
     except Exception as e:
         print(f"Error loading dataset {path}: {e}")
         return False
 
-# Try local dataset files first, then fallback to Downloads
-if not load_dataset('dataset.xlsx', clear_existing=True):
-    if not load_dataset('dataset.csv', clear_existing=True):
-        print("No default dataset found (dataset.xlsx or dataset.csv). Please upload one.")
+# Load the default dataset once at import. Under `gunicorn --preload` that is
+# the master process, and forked workers share the frames copy-on-write.
+# The debug reloader's watcher process (`python app.py` without
+# WERKZEUG_RUN_MAIN) never serves requests, so it skips the load.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    # Try local dataset files first, then fallback to Downloads
+    if not load_dataset('dataset.xlsx', clear_existing=True):
+        if not load_dataset('dataset.csv', clear_existing=True):
+            print("No default dataset found (dataset.xlsx or dataset.csv). Please upload one.")
 
 @app.route("/")
 def home():
     # Serve the frontend dashboard (index.html) directly from the project root
     try:
-        return send_from_directory('.', 'index.html')
+        return send_from_directory('.', 'index.html', max_age=STATIC_PAGE_MAX_AGE, conditional=True)
     except Exception:
         return "Smart Traffic Violation Backend Running"
 
 @app.route('/dataset')
 def dataset_page():
     try:
-        return send_from_directory('.', 'dataset.html')
+        return send_from_directory('.', 'dataset.html', max_age=STATIC_PAGE_MAX_AGE, conditional=True)
     except Exception:
         return "Dataset page not found"
 
@@ -102,112 +308,90 @@ def dataset_page():
 @app.route("/violations", methods=["GET"])
 def get_violations():
     # Ensure we have data if the server restarted or initial load failed
-    if not violations:
+    if store.violations_df.empty:
         if not load_dataset('dataset.xlsx', clear_existing=True):
             load_dataset('dataset.csv', clear_existing=True)
-    return jsonify(violations)
+    # leave out the derived columns; orjson writes floats in their shortest
+    # round-trip form and missing values as null
+    df = store.violations_df.drop(columns=INTERNAL_COLUMNS)
+    if orjson is None:
+        # jsonify would write NaN, which is not valid JSON
+        df = df.astype(object).where(df.notna(), None)
+    return fast_json(df.to_dict('records'))
 
 @app.route("/analytics", methods=["GET"])
 def analytics():
     # Ensure we have data if the server restarted or initial load failed
-    if not violations:
+    if store.violations_df.empty:
         if not load_dataset('dataset.xlsx', clear_existing=True):
             load_dataset('dataset.csv', clear_existing=True)
 
-    # Filter by date range if provided
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    
-    data_source = violations
+    return fast_json(compute_analytics(store.version, start_date, end_date))
+
+
+@lru_cache(maxsize=64)
+def compute_analytics(version, start_date, end_date):
+    """Aggregate the current violations snapshot for the /analytics response.
 
+    `version` is the snapshot's version and only serves as the cache key, so
+    results computed against older data are never returned. `store` is read
+    once so every cache used below belongs to the same snapshot.
+    """
+    snapshot = store
+    df = snapshot.violations_df
+
+    # Filter by date range if provided
     if start_date or end_date:
         try:
-            sd = pd.to_datetime(start_date) if start_date else None
+            # bounds are compared as naive UTC, like the stored ts column
+            sd = pd.to_datetime(start_date, utc=True).tz_convert(None) if start_date else None
             # Set end date to end of that day
-            ed = (pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)) if end_date else None
-            
-            filtered = []
-            for v in data_source:
-                try:
-                    v_date = pd.to_datetime(v.get('date'))
-                    if sd and v_date < sd: continue
-                    if ed and v_date > ed: continue
-                    filtered.append(v)
-                except (ValueError, TypeError):
-                    continue
-            data_source = filtered
+            ed = (pd.to_datetime(end_date, utc=True).tz_convert(None) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)) if end_date else None
+
+            # binary-search the sorted timestamps for the range; rows with a
+            # blank date are kept, rows with an unparseable date are dropped
+            sorted_ts = snapshot.sorted_ts
+            lo = sorted_ts.searchsorted(sd, side='left') if sd is not None else 0
+            hi = sorted_ts.searchsorted(ed, side='right') if ed is not None else len(sorted_ts)
+            # keep the window in file order; ties between locations go to the first one seen
+            df = df.iloc[np.sort(np.concatenate([snapshot.ts_order[lo:hi], snapshot.blank_date_rows]))]
         except Exception as e:
             print(f"Date filter error: {e}")
 
-    total = len(data_source)
-    by_type = {}
-    by_location = {}
-    location_coords = {}
-    by_date = {}
-    by_hour = {i: 0 for i in range(24)}
-    
-    # Safety Stats (2017 vs 2018)
+    total = len(df)
+    # count the category codes rather than hashing strings on every request
+    type_labels, type_counts = category_counts(snapshot, df['type'])
+    location_labels, location_counts = category_counts(snapshot, df['location'])
+    date_labels, date_counts = category_counts(snapshot, df['date'])
+    by_type = {k: int(v) for k, v in zip(type_labels, type_counts) if v}
+    # insert locations in order of first appearance in this window, so
+    # most_common breaks ties the way a row-by-row count would
+    location_groups, _ = snapshot.category_labels['location']
+    present, first_row = np.unique(location_groups[df['location'].cat.codes.to_numpy()], return_index=True)
+    by_location = Counter({location_labels[g]: int(location_counts[g]) for g in present[np.argsort(first_row)]})
+    by_date = {k: int(v) for k, v in zip(date_labels, date_counts) if v}
+    hours = df['hour'].dropna().astype(np.int16).to_numpy()
+    by_hour = dict(enumerate(np.bincount(hours, minlength=24).tolist()))
+
+    # Safety Stats (2017 vs 2018), summed over whichever columns exist in the dataset
     safety_stats = {
-        "accidents_2017": 0, "killed_2017": 0, "injured_2017": 0,
-        "accidents_2018": 0, "killed_2018": 0, "injured_2018": 0
+        key: float(pd.to_numeric(df[col], errors='coerce').sum()) if col in df.columns else 0.0
+        for key, col in SAFETY_COLUMNS.items()
     }
 
-    for v in data_source:
-        # Type Analysis
-        t = v.get('type') or v.get('Type') or v.get('Violation Type') or 'Unknown'
-        t = str(t).strip() or 'Unknown'
-        by_type[t] = by_type.get(t, 0) + 1
-
-        # Location Analysis (High-Risk Zones)
-        loc = v.get('location') or 'Unknown'
-        loc = str(loc).strip() or 'Unknown'
-        if loc:
-            by_location[loc] = by_location.get(loc, 0) + 1
-            # Capture coordinates if available
-            if loc not in location_coords:
-                lat = v.get('latitude')
-                lon = v.get('longitude')
-                if lat is not None and lon is not None:
-                    try:
-                        location_coords[loc] = {'lat': float(lat), 'lng': float(lon)}
-                    except (ValueError, TypeError):
-                        pass
-
-        # Date Analysis
-        d = v.get('date') or 'Unknown'
-        d = str(d).strip() or 'Unknown'
-        by_date[d] = by_date.get(d, 0) + 1
-        
-        # Hour Analysis
-        try:
-            if d != 'Unknown':
-                dt = pd.to_datetime(d)
-                if pd.notna(dt):
-                    by_hour[dt.hour] += 1
-        except (ValueError, TypeError):
-            pass
-            
-        # Aggregate Safety Data (if columns exist in dataset)
-        try:
-            safety_stats["accidents_2017"] += float(v.get("Number of Accidents - 2017", 0) or 0)
-            safety_stats["killed_2017"] += float(v.get("Persons Killed - 2017", 0) or 0)
-            safety_stats["injured_2017"] += float(v.get("Persons Injured - 2017", 0) or 0)
-            safety_stats["accidents_2018"] += float(v.get("Number of Accidents - 2018", 0) or 0)
-            safety_stats["killed_2018"] += float(v.get("Persons Killed - 2018", 0) or 0)
-            safety_stats["injured_2018"] += float(v.get("Persons Injured - 2018", 0) or 0)
-        except (ValueError, TypeError):
-            pass
-
-    over_speed = sum(cnt for k, cnt in by_type.items() if 'speed' in k.lower())
-    signal_jump = sum(cnt for k, cnt in by_type.items() if 'signal' in k.lower())
+    # match on the distinct type labels, then add up their counts
+    over_speed = int(type_counts[np.asarray(type_labels.str.contains('speed', case=False, regex=False))].sum())
+    signal_jump = int(type_counts[np.asarray(type_labels.str.contains('signal', case=False, regex=False))].sum())
 
     # Identify High-Risk Zones (Black Spots)
-    sorted_locations = sorted(by_location.items(), key=lambda x: x[1], reverse=True)
     high_risk_zones = []
-    for k, v in sorted_locations[:5]:
+    for k, v in by_location.most_common(5):
         zone = {"location": k, "count": v}
-        if k in location_coords:
-            zone['coordinates'] = location_coords[k]
+        if k in snapshot.coords_df.index:
+            lat, lon = snapshot.coords_df.loc[k, ['latitude', 'longitude']]
+            zone['coordinates'] = {'lat': float(lat), 'lng': float(lon)}
         high_risk_zones.append(zone)
 
     # Calculate % Changes
@@ -230,10 +414,10 @@ def analytics():
         top_zone = high_risk_zones[0]['location']
         recommendations.append(f"Priority Action: Increase patrol presence at high-risk zone '{top_zone}'.")
 
-    return jsonify({
+    return {
         "total_violations": total,
         "by_type": by_type,
-        "by_location": by_location,
+        "by_location": dict(by_location),
         "by_date": by_date,
         "by_hour": by_hour,
         "high_risk_zones": high_risk_zones,
@@ -241,7 +425,7 @@ def analytics():
         "signal_jump": signal_jump,
         "recommendations": recommendations,
         "safety_stats": safety_stats
-    })
+    }
 
 @app.route('/upload-dataset', methods=['POST'])
 def upload_dataset():
@@ -273,7 +457,7 @@ def upload_dataset():
         # keep file for debugging but inform the client
         return jsonify({'uploaded': False, 'error': 'failed to parse dataset', 'path': str(dest)}), 400
 
-    return jsonify({'uploaded': True, 'path': str(dest), 'total': len(violations), 'mode': 'append' if not replace else 'replace'})
+    return jsonify({'uploaded': True, 'path': str(dest), 'total': len(store.violations_df), 'mode': 'append' if not replace else 'replace'})
 
 
 @app.route('/reload-dataset', methods=['POST'])
@@ -290,7 +474,7 @@ def clear_dataset():
     """Clear all in-memory violations. Optionally delete uploaded files if 'delete_files' provided."""
     data = request.json or {}
     delete_files = bool(data.get('delete_files'))
-    violations.clear()
+    set_violations(empty_violations_df())
     if delete_files:
         upload_dir = Path('uploads')
         if upload_dir.exists() and upload_dir.is_dir():
@@ -299,7 +483,7 @@ def clear_dataset():
                     f.unlink()
                 except Exception as e:
                     print('Failed to remove', f, e)
-    return jsonify({'cleared': True, 'total': len(violations)})
+    return jsonify({'cleared': True, 'total': len(store.violations_df)})
 
 
 @app.route('/uploaded-files', methods=['GET'])
@@ -307,10 +491,10 @@ def uploaded_files():
     """Return list of files in the uploads directory and a count."""
     upload_dir = Path('uploads')
     files = []
-    if upload_dir.exists() and upload_dir.is_dir():
-        for f in upload_dir.iterdir():
-            if f.is_file():
-                files.append(str(f.name))
+    if upload_dir.is_dir():
+        # scandir entries carry the file type, so is_file() needs no extra stat()
+        with os.scandir(upload_dir) as it:
+            files = [e.name for e in it if e.is_file()]
     return jsonify({'count': len(files), 'files': files})
 
 
@@ -320,14 +504,15 @@ def delete_uploaded_files():
     upload_dir = Path('uploads')
     deleted = []
     errors = {}
-    if upload_dir.exists() and upload_dir.is_dir():
-        for f in list(upload_dir.iterdir()):
+    if upload_dir.is_dir():
+        with os.scandir(upload_dir) as it:
+            entries = [e for e in it if e.is_file()]
+        for e in entries:
             try:
-                if f.is_file():
-                    f.unlink()
-                    deleted.append(str(f.name))
-            except Exception as e:
-                errors[str(f.name)] = str(e)
+                os.unlink(e.path)
+                deleted.append(e.name)
+            except Exception as ex:
+                errors[e.name] = str(ex)
     return jsonify({'deleted': len(deleted), 'files': deleted, 'errors': errors})
 
 
@@ -347,23 +532,32 @@ def preview_dataset():
     name = filename.lower()
 
     try:
-        data = f.read()
-        bio = io.BytesIO(data)
+        # parse straight from the upload stream instead of copying it into memory first
+        stream = f.stream
 
         if name.endswith('.csv'):
             # read CSV with pandas (safely) and return small preview
             try:
-                df = pd.read_csv(bio, nrows=20)
+                # pyarrow can't honour nrows, so the default parser is used here
+                df = pd.read_csv(stream, nrows=20)
             except Exception as e:
                 return jsonify({'ok': False, 'error': 'failed to parse CSV', 'message': str(e)}), 400
             cols = [str(c) for c in df.columns]
             rows = df.fillna('').values.tolist()[:10]
             return jsonify({'ok': True, 'type': 'csv', 'columns': cols, 'rows': rows})
 
-        elif name.endswith('.xlsx') or name.endswith('.xls'):
+        elif name.endswith('.xlsx'):
+            try:
+                sheets = preview_workbook(stream)
+            except Exception as e:
+                return jsonify({'ok': False, 'error': 'failed to parse XLSX', 'message': str(e)}), 400
+            return jsonify({'ok': True, 'type': 'xlsx', 'sheets': sheets})
+
+        elif name.endswith('.xls'):
             try:
-                # use pandas to read all sheets in memory but only return small samples
-                sheets = pd.read_excel(bio, sheet_name=None, engine='openpyxl')
+                # legacy .xls isn't supported by openpyxl; read all sheets with
+                # pandas but only return small samples
+                sheets = read_excel_fast(stream, sheet_name=None)
             except Exception as e:
                 return jsonify({'ok': False, 'error': 'failed to parse XLSX', 'message': str(e)}), 400
             result = {'ok': True, 'type': 'xlsx', 'sheets': {}}